@@ -0,0 +1,79 @@
+import asyncio
+from typing import TYPE_CHECKING, Awaitable, Callable, List, NamedTuple, Optional, Set
+
+if TYPE_CHECKING:
+    from miner.openai.miner_openai import Evidence
+
+
+class BatchEntry(NamedTuple):
+    """
+    A statement waiting to be sent to OpenAI as part of a batch.
+    """
+    statement: str
+    sources: List[str]
+    future: asyncio.Future  # resolved with the evidence list for this statement
+
+
+class StatementBatcher:
+    """
+    Coalesces statements that arrive within a short window into a single request.
+
+    Callers await submit(); a background task collects up to max_size entries, waiting at most
+    window seconds after the first one, and hands them to handler. The handler must resolve
+    the future of every entry; any entry left unresolved when it returns gets an empty list.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[BatchEntry]], Awaitable[None]],
+        max_size: int = 8,
+        window: float = 0.05,
+    ):
+        self.handler = handler
+        self.max_size = max_size
+        self.window = window
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, statement: str, sources: List[str]) -> List["Evidence"]:
+        if self.queue is None:
+            # Started lazily so the queue and worker live on the event loop serving requests
+            self.queue = asyncio.Queue()
+            self._spawn(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(BatchEntry(statement, sources, future))
+        return await future
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        # Keep a reference so running tasks are not garbage collected
+        task = asyncio.ensure_future(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatched concurrently so a slow completion does not delay the next batch
+            self._spawn(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[BatchEntry]) -> None:
+        try:
+            await self.handler(batch)
+        except Exception as e:
+            for entry in batch:
+                if not entry.future.done():
+                    entry.future.set_exception(e)
+        finally:
+            for entry in batch:
+                if not entry.future.done():
+                    entry.future.set_result([])
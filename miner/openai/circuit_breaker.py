@@ -0,0 +1,32 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Fails fast during an outage: once max_failures errors are recorded within window seconds
+    the breaker opens, and callers should skip the call for the next cooldown seconds.
+    """
+    max_failures: int = 5
+    window: float = 30.0
+    cooldown: float = 60.0
+    failures: Deque[float] = field(default_factory=deque)
+    open_until: float = 0.0
+
+    def is_open(self) -> bool:
+        return time.monotonic() < self.open_until
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        self.failures.append(now)
+        while self.failures[0] < now - self.window:
+            self.failures.popleft()
+        if len(self.failures) >= self.max_failures:
+            self.open_until = now + self.cooldown
+            self.failures.clear()
+
+    def record_success(self) -> None:
+        self.failures.clear()
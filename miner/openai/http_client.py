@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import os
+import sys
+
+import bittensor as bt
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DEFAULT_CONNECTION_LIMITS, DefaultAsyncHttpxClient, Timeout
+
+# The SDK does not export its Limits class. Taking it from the SDK's default limits keeps it
+# on the HTTP package the installed SDK is built on (httpx or httpx2).
+_Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+
+def create_http_client() -> DefaultAsyncHttpxClient:
+    """
+    Builds the persistent HTTP/2 client shared by all OpenAI requests of the miner. All HTTP
+    types come from the SDK, since a client of another httpx package is silently misconfigured.
+    """
+    return DefaultAsyncHttpxClient(
+        http2=True,
+        limits=_Limits(max_connections=64, max_keepalive_connections=64),
+        timeout=Timeout(60.0, connect=5.0),
+    )
+
+
+async def smoke_check(openai_client: AsyncOpenAI, model: str) -> int:
+    """
+    Streams one chat completion through openai_client and returns the number of server-sent
+    events received. Raises if the request or the stream fails.
+    """
+    events = 0
+    async with openai_client.chat.completions.with_streaming_response.create(
+        model=model,
+        messages=[{"role": "user", "content": "Reply with OK."}],
+        max_tokens=5,
+        stream=True,
+    ) as response:
+        async for line in response.iter_lines():
+            if line.startswith("data:"):
+                events += 1
+    return events
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Sends one request through the OpenAI miner's HTTP client."
+    )
+    parser.add_argument("--model", type=str, default="gpt-4o", help="OpenAI model to use.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    http_client = create_http_client()
+    openai_client = AsyncOpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"), http_client=http_client, max_retries=0
+    )
+    try:
+        events = await smoke_check(openai_client, args.model)
+    except Exception as e:
+        bt.logging.error(f"OpenAI smoke check failed: {e!r}")
+        sys.exit(1)
+    finally:
+        await http_client.aclose()
+    bt.logging.success(f"OpenAI smoke check passed, received {events} events")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
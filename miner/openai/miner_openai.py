@@ -1,26 +1,269 @@
 import os
-import time
 import argparse
+import asyncio
+import contextlib
 import traceback
 import bittensor as bt
 import json
-from typing import Tuple, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Tuple, List, Optional, AsyncIterator, Mapping, Set
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
+import msgspec
+import tiktoken
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 from shared.log_data import LoggerType
 from shared.proxy_log_handler import register_proxy_log_handler
 from shared.veridex_protocol import VericoreSynapse, SourceEvidence
+from miner.openai.batcher import BatchEntry, StatementBatcher
+from miner.openai.circuit_breaker import CircuitBreaker
+from miner.openai.http_client import create_http_client
+from miner.openai.stream_parser import JsonStreamParser
 
 # OpenAI client
-from openai import OpenAI
+from openai import (
+    AsyncAPIResponse,
+    AsyncOpenAI,
+    NOT_GIVEN,
+    APIConnectionError,
+    APIError,
+    InternalServerError,
+    OpenAIError,
+    RateLimitError,
+)
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+if TYPE_CHECKING:
+    # Only needed by the optional semantic cache
+    import numpy as np
 
 # debug
 bt.logging.set_trace()
 
+# bt.logging formats its message eagerly and treats extra positional arguments as a
+# prefix/suffix, so the per-request hot path logs through the underlying bittensor logger
+# with lazy %-style arguments instead
+logger = logging.getLogger("bittensor")
+
 load_dotenv()
 
+# Message dicts are shared between requests, so they are read-only views.
+# With structured outputs the json_schema response format enforces the shape of the answer,
+# so the system prompt only has to describe the task.
+_SYSTEM_MSG = MappingProxyType({
+    "role": "system",
+    "content": (
+        "You are a fact-checking API. Return evidence per the provided JSON schema: snippets that "
+        "directly agree with or contradict the statement. Snippets must be verbatim from the "
+        "source URL, shortened to the relevant part."
+    ),
+})
+
+_BATCH_SYSTEM_MSG = MappingProxyType({
+    "role": "system",
+    "content": (
+        "You are a fact-checking API. For every statement given by id, return evidence per the "
+        "provided JSON schema: snippets that directly agree with or contradict that statement. "
+        "Snippets must be verbatim from the source URL, shortened to the relevant part."
+    ),
+})
+
+# Full prompts for models without json_schema support (--no_json_schema), which have to be
+# told the exact shape of the answer
+_JSON_ARRAY_SYSTEM_MSG = MappingProxyType({
+    "role": "system",
+    "content": """
+You are an API that fact checks statements with high accuracy.
+
+Rules:
+1. Return the response **only as a JSON array**.
+2. The response **must be a valid JSON array**, formatted as:
+   ```json
+   [{"url": "<source url>", "snippet": "<snippet that directly agrees with or contradicts statement>"}]
+   ```
+3. Do not include any introductory text, explanations, or additional commentary.
+4. Do not add any labels, headers, or markdown formatting—only return the JSON array.
+5. Each snippet must be an exact match of text from the source URL.
+6. Include diverse sources when possible (scholarly articles, reputable news outlets, government sites).
+7. For controversial topics, include evidence from different perspectives.
+8. Focus on factual information rather than opinions.
+9. Prefer recent sources when temporal relevance matters.
+
+Steps:
+1. Find sources / text segments that either contradict or agree with the user provided statement.
+2. Pick and extract the segments that most strongly agree or contradict the statement.
+3. Do not return urls or segments that do not directly support or disagree with the statement.
+4. Do not change any text in the segments (must return an exact html text match), but do shorten the segment to get only the part that directly agrees or disagrees with the statement.
+5. Create the json object for each source and statement and add them only INTO ONE array.
+
+Response MUST be returned as a json array ONLY.
+""",
+})
+
+_JSON_ARRAY_BATCH_SYSTEM_MSG = MappingProxyType({
+    "role": "system",
+    "content": _JSON_ARRAY_SYSTEM_MSG["content"] + """
+The user may provide several statements at once as a JSON array of
+{"id": <id>, "statement": <statement>, "sources": [<preferred sources>]} objects.
+In that case apply the rules and steps above to every statement separately and return
+ONE json array with one object per statement, formatted as:
+   [{"id": <id>, "evidence": [{"url": "<source url>", "snippet": "<snippet>"}]}]
+""",
+})
+
+_USER_TMPL_WITH_SRC = """Return snippets that strongly agree with or reject the following statement:
+"{statement}"
+
+Prioritize these sources if possible: {sources}"""
+
+_USER_TMPL_NO_SRC = """Return snippets that strongly agree with or reject the following statement:
+"{statement}"
+
+Find the most reliable and relevant sources available."""
+
+# Used when several statements are sent to OpenAI in one request
+_BATCH_USER_TMPL = """Return snippets that strongly agree with or reject each of the following
+statements. Prioritize the listed sources of a statement if possible, otherwise find the most
+reliable and relevant sources available.
+
+{statements}"""
+
+
+@lru_cache(maxsize=1024)
+def _build_messages(
+    statement: str, sources: Tuple[str, ...], structured: bool = True
+) -> Tuple[MappingProxyType, ...]:
+    """
+    Builds the chat messages for a single statement. Memoized so repeated statements reuse
+    the formatted prompt; the returned messages are immutable and safe to share.
+    """
+    if sources:
+        user_content = _USER_TMPL_WITH_SRC.format(statement=statement, sources=", ".join(sources))
+    else:
+        user_content = _USER_TMPL_NO_SRC.format(statement=statement)
+    system_msg = _SYSTEM_MSG if structured else _JSON_ARRAY_SYSTEM_MSG
+    return system_msg, MappingProxyType({"role": "user", "content": user_content})
+
+
+# Structured output formats; OpenAI enforces these server side so the response is always
+# valid JSON of this shape
+_EVIDENCE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"url": {"type": "string"}, "snippet": {"type": "string"}},
+        "required": ["url", "snippet"],
+        "additionalProperties": False,
+    },
+}
+
+_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "evidence",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"evidence": _EVIDENCE_SCHEMA},
+            "required": ["evidence"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+_BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "batch_evidence",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "integer"},
+                            "evidence": _EVIDENCE_SCHEMA,
+                        },
+                        "required": ["id", "evidence"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+class Evidence(msgspec.Struct):
+    url: str
+    snippet: str
+
+
+class BatchResult(msgspec.Struct):
+    id: int
+    evidence: List[Evidence]
+
+
+# Only the parts of a streamed chat completion chunk the miner reads
+class ChunkDelta(msgspec.Struct):
+    content: Optional[str] = None
+
+
+class ChunkChoice(msgspec.Struct):
+    delta: ChunkDelta = msgspec.field(default_factory=ChunkDelta)
+
+
+class CompletionChunk(msgspec.Struct):
+    choices: List[ChunkChoice] = []
+    error: Optional[dict] = None
+
+
+# Streamed chunks and items are decoded and validated in one pass with typed msgspec decoders
+_CHUNK_DECODER = msgspec.json.Decoder(CompletionChunk)
+_EVIDENCE_DECODER = msgspec.json.Decoder(Evidence)
+_BATCH_RESULT_DECODER = msgspec.json.Decoder(BatchResult)
+
+# Transient OpenAI errors worth retrying (APITimeoutError is an APIConnectionError)
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+# Upper bound on prompt tokens; preferred sources beyond it are dropped
+_PROMPT_TOKEN_BUDGET = int(os.environ.get("OPENAI_PROMPT_TOKEN_BUDGET", "6000"))
+
+# (model, statement, preferred sources)
+CacheKey = Tuple[str, str, Tuple[str, ...]]
+
+# In-process LRU cache of parsed OpenAI responses, keyed on everything that varies in the prompt.
+# Entries expire after OPENAI_CACHE_TTL seconds; set OPENAI_CACHE_SIZE=0 to disable it.
+_CACHE_MAX_SIZE = int(os.environ.get("OPENAI_CACHE_SIZE", "4096"))
+_CACHE_TTL = float(os.environ.get("OPENAI_CACHE_TTL", "3600"))
+_CACHE: "TTLCache[CacheKey, List[Evidence]]" = TTLCache(maxsize=_CACHE_MAX_SIZE, ttl=_CACHE_TTL)
+
+
+def _cache_get(key: CacheKey) -> Optional[List[Evidence]]:
+    return _CACHE.get(key)
+
+
+def _cache_put(key: CacheKey, data: List[Evidence]) -> None:
+    if _CACHE_MAX_SIZE <= 0:
+        return
+    _CACHE[key] = data
+
+
 class MinerOpenAI:
     def __init__(self):
         self.config = self.get_config()
@@ -32,16 +275,70 @@ class MinerOpenAI:
         if not self.openai_api_key or self.openai_api_key.startswith("YOUR_API_KEY_HERE"):
             bt.logging.warning("No OPENAI_API_KEY found. Please set it in your .env file.")
             
-        # Initialize OpenAI client
-        self.openai_client = OpenAI(
-            api_key=self.openai_api_key
+        # Initialize OpenAI client (async). One persistent HTTP/2 client is shared by all requests,
+        # so concurrent calls multiplex over a kept-alive connection instead of opening new ones
+        self.http_client = create_http_client()
+        self.openai_client = AsyncOpenAI(
+            api_key=self.openai_api_key,
+            http_client=self.http_client,
+            max_retries=0,  # retries are handled in stream_openai
         )
+        # Cap outstanding OpenAI calls so bursts of requests stay below the provider rate limit
+        self.openai_semaphore = asyncio.Semaphore(int(os.environ.get("OPENAI_CONCURRENCY", "16")))
+        # Skip OpenAI entirely for a while after a burst of failures
+        self.openai_breaker = CircuitBreaker()
+        # Set by setup_proxy_logger when log handlers are moved to a background thread
+        self.log_listener = None
+
+        # Optionally also reuse answers for near-duplicate statements (requires faiss)
+        self.semantic_cache = None
+        if os.environ.get("SEMANTIC_CACHE", "0") == "1" and _CACHE_MAX_SIZE > 0:
+            from miner.openai.semantic_cache import SemanticCache
+
+            self.semantic_cache = SemanticCache(
+                self.openai_client,
+                _CACHE,
+                threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+            )
+
+        # Token counts of the fixed parts of the prompt, used to fit preferred sources in budget.
+        # Trimming is best effort: tiktoken downloads its BPE files on first use, so when the
+        # tokenizer cannot be loaded all sources are sent.
+        self.encoding = None
+        try:
+            try:
+                self.encoding = tiktoken.encoding_for_model(self.config.model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            bt.logging.warning(f"Could not load tokenizer, sources will not be trimmed: {e}")
+        if self.encoding is not None:
+            if self.config.no_json_schema:
+                system_msg, batch_system_msg = _JSON_ARRAY_SYSTEM_MSG, _JSON_ARRAY_BATCH_SYSTEM_MSG
+            else:
+                system_msg, batch_system_msg = _SYSTEM_MSG, _BATCH_SYSTEM_MSG
+            self.prompt_tokens = self.count_tokens(system_msg["content"] + _USER_TMPL_WITH_SRC)
+            self.batch_prompt_tokens = self.count_tokens(
+                batch_system_msg["content"] + _BATCH_USER_TMPL
+            )
+
+        # Optionally coalesce statements arriving close together into one OpenAI request
+        batch_size = int(os.environ.get("OPENAI_BATCH_SIZE", "1"))
+        batch_window = int(os.environ.get("OPENAI_BATCH_WINDOW_MS", "50")) / 1000
+        self.batcher = None
+        if batch_size > 1:
+            self.batcher = StatementBatcher(self.call_openai_batch, batch_size, batch_window)
 
     def get_config(self):
         parser = argparse.ArgumentParser()
         parser.add_argument("--custom", default="my_custom_value", help="Adds a custom value.")
         parser.add_argument("--netuid", type=int, default=1, help="Subnet UID.")
         parser.add_argument("--model", type=str, default="gpt-4o", help="OpenAI model to use.")
+        parser.add_argument(
+            "--no_json_schema",
+            action="store_true",
+            help="Do not request json_schema structured outputs (for models that lack support).",
+        )
         bt.subtensor.add_args(parser)
         bt.logging.add_args(parser)
         bt.wallet.add_args(parser)
@@ -71,6 +368,19 @@ class MinerOpenAI:
         bt_logger = logging.getLogger("bittensor")
         register_proxy_log_handler(bt_logger, LoggerType.Miner, self.wallet)
 
+        # bittensor's own handlers already sit behind a queue, but the proxy handler posts every
+        # record over HTTP. Move such handlers behind a queue as well so that logging from the
+        # forward path never blocks on log shipping.
+        handlers = [h for h in bt_logger.handlers if not isinstance(h, QueueHandler)]
+        if not handlers:
+            return
+        for handler in handlers:
+            bt_logger.removeHandler(handler)
+        log_queue = queue.SimpleQueue()
+        bt_logger.addHandler(QueueHandler(log_queue))
+        self.log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.log_listener.start()
+
     def setup_bittensor_objects(self):
         bt.logging.info("Setting up Bittensor objects.")
         self.wallet = bt.wallet(config=self.config)
@@ -80,6 +390,8 @@ class MinerOpenAI:
         bt.logging.info(f"Subtensor: {self.subtensor}")
 
         self.metagraph = self.subtensor.metagraph(self.config.netuid)
+        # Set copy of the registered hotkeys for constant time lookups in blacklist_fn
+        self.hotkey_set = set(self.metagraph.hotkeys)
         bt.logging.info(f"Metagraph: {self.metagraph}")
 
         if self.wallet.hotkey.ss58_address not in self.metagraph.hotkeys:
@@ -92,125 +404,288 @@ class MinerOpenAI:
             bt.logging.info(f"Miner on uid: {self.my_subnet_uid}")
 
     def blacklist_fn(self, synapse: VericoreSynapse) -> Tuple[bool, str]:
-        if synapse.dendrite.hotkey not in self.metagraph.hotkeys:
+        if synapse.dendrite.hotkey not in self.hotkey_set:
             bt.logging.trace(f"Blacklisting unrecognized hotkey {synapse.dendrite.hotkey}")
             return True, None
         bt.logging.trace(f"Not blacklisting recognized hotkey {synapse.dendrite.hotkey}")
         return False, None
 
-    def veridex_forward(self, synapse: VericoreSynapse) -> VericoreSynapse:
+    async def veridex_forward(self, synapse: VericoreSynapse) -> VericoreSynapse:
         """
         Calls OpenAI. Returns a list of (url, snippet) with supporting evidence.
         """
-        bt.logging.info(f"{synapse.request_id} | Received Veridex request")
+        logger.info("%s | Received Veridex request", synapse.request_id)
         statement = synapse.statement
         sources = synapse.sources  # Get preferred sources if provided
         
-        bt.logging.info(f"{synapse.request_id} | Statement: {statement}")
+        logger.info("%s | Statement: %s", synapse.request_id, statement)
         if sources:
-            bt.logging.info(f"{synapse.request_id} | Preferred sources: {sources}")
+            logger.info("%s | Preferred sources: %s", synapse.request_id, sources)
             
-        bt.logging.info(f"{synapse.request_id} | Calling OpenAI")
-        results = self.call_openai(statement, sources)
-        bt.logging.info(f"{synapse.request_id} | Received response from OpenAI")
+        logger.info("%s | Calling OpenAI", synapse.request_id)
+        results = await self.call_openai(statement, sources)
+        logger.info("%s | Received response from OpenAI", synapse.request_id)
         
         if not results:
             synapse.veridex_response = []
             return synapse
 
+        # Field types are already validated by the decoder; the content still needs cleaning
         final_evidence = []
-        for item in results:
-            url = item.get("url", "").strip()
-            snippet = item.get("snippet", "").strip()
+        for ev in results:
+            url = ev.url.strip()
+            snippet = ev.snippet.strip()
             if url and snippet:
-                # Store them in SourceEvidence
-                ev = SourceEvidence(url=url, excerpt=snippet)
-                final_evidence.append(ev)
+                final_evidence.append(SourceEvidence(url=url, excerpt=snippet))
 
         synapse.veridex_response = final_evidence
-        bt.logging.info(f"{synapse.request_id} | Miner returns {len(final_evidence)} evidence items for statement: '{statement}'.")
+        logger.info(
+            "%s | Miner returns %d evidence items for statement: '%s'.",
+            synapse.request_id,
+            len(final_evidence),
+            statement,
+        )
         return synapse
 
-    def call_openai(self, statement: str, preferred_sources: List[str] = None) -> List[dict]:
+    async def call_openai(
+        self, statement: str, preferred_sources: List[str] = None
+    ) -> List[Evidence]:
         """
         1) Provide system & user messages.
         2) Parse JSON from the response -> [ {url, snippet}, ... ].
         """
-        system_content = """
-You are an API that fact checks statements with high accuracy.
+        # The system prompt is a module constant, so it does not need to be part of the key
+        cache_key = (self.config.model, statement, tuple(preferred_sources or ()))
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached OpenAI response")
+            return cached
+
+        if self.openai_breaker.is_open():
+            logger.warning("OpenAI circuit breaker is open, skipping request")
+            return []
 
-Rules:
-1. Return the response **only as a JSON array**.
-2. The response **must be a valid JSON array**, formatted as:
-   ```json
-   [{"url": "<source url>", "snippet": "<snippet that directly agrees with or contradicts statement>"}]
-   ```
-3. Do not include any introductory text, explanations, or additional commentary.
-4. Do not add any labels, headers, or markdown formatting—only return the JSON array.
-5. Each snippet must be an exact match of text from the source URL.
-6. Include diverse sources when possible (scholarly articles, reputable news outlets, government sites).
-7. For controversial topics, include evidence from different perspectives.
-8. Focus on factual information rather than opinions.
-9. Prefer recent sources when temporal relevance matters.
+        embedding = None
+        if self.semantic_cache is not None:
+            try:
+                embedding = await self.semantic_cache.embed(statement, cache_key[2])
+            except OpenAIError as e:
+                logger.warning("Error embedding statement for semantic cache: %s", e)
+            else:
+                similar_key = self.semantic_cache.search(embedding)
+                cached = _cache_get(similar_key) if similar_key is not None else None
+                if cached is not None:
+                    logger.info("Returning cached OpenAI response for a similar statement")
+                    return cached
+
+        if self.batcher is not None:
+            # Sources of batched statements are fitted to the budget of the whole batch prompt
+            data = await self.batcher.submit(statement, list(cache_key[2]))
+            if data:
+                self.cache_response(cache_key, data, embedding)
+            return data
 
-Steps:
-1. Find sources / text segments that either contradict or agree with the user provided statement.
-2. Pick and extract the segments that most strongly agree or contradict the statement.
-3. Do not return urls or segments that do not directly support or disagree with the statement.
-4. Do not change any text in the segments (must return an exact html text match), but do shorten the segment to get only the part that directly agrees or disagrees with the statement.
-5. Create the json object for each source and statement and add them only INTO ONE array.
+        # The cache is keyed on the requested sources, the prompt only gets those that fit
+        sources = self.fit_sources(statement, cache_key[2])
 
-Response MUST be returned as a json array ONLY.
-"""
-        
-        # Modify user content based on whether preferred sources are provided
-        if preferred_sources and len(preferred_sources) > 0:
-            source_list = ", ".join(preferred_sources)
-            user_content = f"""Return snippets that strongly agree with or reject the following statement:
-"{statement}"
+        # Prompt text is built once at import time; only the statement and sources vary
+        messages = list(_build_messages(statement, sources, not self.config.no_json_schema))
 
-Prioritize these sources if possible: {source_list}"""
-        else:
-            user_content = f"""Return snippets that strongly agree with or reject the following statement:
-"{statement}"
+        data = []
+        try:
+            async for ev in self.stream_openai(messages, _RESPONSE_FORMAT, _EVIDENCE_DECODER):
+                data.append(ev)
+        except Exception as e:
+            # Evidence completed before the failure is still returned, but not cached
+            logger.error("Error calling OpenAI: %s", e)
+            return data
 
-Find the most reliable and relevant sources available."""
+        if data:
+            self.cache_response(cache_key, data, embedding)
+        return data
 
+    def fit_sources(self, statement: str, sources: Tuple[str, ...]) -> Tuple[str, ...]:
+        """
+        Keeps as many preferred sources, in order, as fit in the prompt token budget.
+        """
+        if not sources or self.encoding is None:
+            return sources
+        budget = _PROMPT_TOKEN_BUDGET - self.prompt_tokens - self.count_tokens(statement)
+        for i, source in enumerate(sources):
+            budget -= self.count_tokens(source) + 1  # ", " separator
+            if budget < 0:
+                logger.warning(
+                    "Dropping %d of %d preferred sources to fit the prompt token budget",
+                    len(sources) - i,
+                    len(sources),
+                )
+                return sources[:i]
+        return sources
+
+    def fit_batch_sources(self, statements: List[dict]) -> None:
+        """
+        Drops preferred sources from the statements of a batch until the assembled prompt fits
+        in the prompt token budget. Sources are kept round robin, so every statement keeps its
+        first source before any keeps its second.
+        """
+        if self.encoding is None:
+            return
+        requested = [item["sources"] for item in statements]
+        budget = _PROMPT_TOKEN_BUDGET - self.batch_prompt_tokens
+        for item in statements:
+            item["sources"] = []
+            budget -= self.count_tokens(json.dumps(item))
+        for position in range(max(map(len, requested), default=0)):
+            for item, sources in zip(statements, requested):
+                if position >= len(sources):
+                    continue
+                budget -= self.count_tokens(json.dumps(sources[position])) + 1  # ", " separator
+                if budget < 0:
+                    dropped = sum(map(len, requested)) - sum(len(s["sources"]) for s in statements)
+                    logger.warning(
+                        "Dropping %d of %d preferred sources to fit the batch prompt token budget",
+                        dropped,
+                        sum(map(len, requested)),
+                    )
+                    return
+                item["sources"].append(sources[position])
+
+    def count_tokens(self, text: str) -> int:
+        # Statements and sources come from validators, so special token text such as
+        # <|endoftext|> is encoded as plain text instead of raising
+        return len(self.encoding.encode_ordinary(text))
+
+    def cache_response(
+        self, key: CacheKey, data: List[Evidence], embedding: Optional["np.ndarray"]
+    ) -> None:
+        _cache_put(key, data)
+        if embedding is not None:
+            self.semantic_cache.add(embedding, key)
+
+    async def call_openai_batch(self, batch: List[BatchEntry]) -> None:
+        """
+        Sends several statements in one OpenAI request and resolves the future of each
+        entry as soon as its evidence list has been streamed.
+        """
+        statements = [
+            {"id": i, "statement": entry.statement, "sources": entry.sources or []}
+            for i, entry in enumerate(batch)
+        ]
+        self.fit_batch_sources(statements)
         messages = [
-            {"role": "system", "content": system_content},
-            {"role": "user", "content": user_content},
+            _JSON_ARRAY_BATCH_SYSTEM_MSG if self.config.no_json_schema else _BATCH_SYSTEM_MSG,
+            {"role": "user", "content": _BATCH_USER_TMPL.format(statements=json.dumps(statements))},
         ]
 
-        raw_text = None
+        logger.info("Calling OpenAI for a batch of %d statements", len(batch))
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.config.model,  # Use model from config (default: gpt-4o)
-                messages=messages,
-                temperature=0.2,  # Lower temperature for more factual responses
-                stream=False
-            )
-            if not hasattr(response, "choices") or len(response.choices) == 0:
-                bt.logging.warn(f"OpenAI returned no choices: {response}")
-                return []
-                
-            raw_text = response.choices[0].message.content.strip()
-            # Check if the response starts with ```json and ends with ```
-            if raw_text.startswith("```json") and raw_text.endswith("```"):
-                # Extract JSON part between the backticks
-                raw_text = raw_text[7:-3].strip()
-                
-            data = json.loads(raw_text)
-            if not isinstance(data, list):
-                bt.logging.warn(f"OpenAI response is not a list: {data}")
-                return []
-                
-            return data
+            async for result in self.stream_openai(
+                messages, _BATCH_RESPONSE_FORMAT, _BATCH_RESULT_DECODER
+            ):
+                if not 0 <= result.id < len(batch):
+                    continue
+                future = batch[result.id].future
+                if not future.done():
+                    future.set_result(result.evidence)
         except Exception as e:
-            if raw_text is not None:
-                bt.logging.error(f"Raw Text of AI Response: {raw_text}")
-
-            bt.logging.error(f"Error calling OpenAI: {e}")
-            return []
+            # Statements without a result get an empty list from the batcher
+            logger.error("Error calling OpenAI for batch: %s", e)
+
+    async def stream_openai(
+        self,
+        messages: List[Mapping],
+        response_format: Optional[dict],
+        decoder: msgspec.json.Decoder,
+    ) -> AsyncIterator[msgspec.Struct]:
+        """
+        Streams a chat completion and yields each object of the returned JSON array, decoded
+        with decoder, as soon as it is complete. Objects that do not match the decoder's type
+        are skipped. With a structured output format the array is the single property of the
+        top level object; otherwise the model is trusted to return a bare array.
+        """
+        if self.config.no_json_schema:
+            response_format = None
+        parser = JsonStreamParser(item_depth=3 if response_format else 2)
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                response = await self.open_openai_stream(messages, response_format, stack)
+                # The server-sent events are decoded straight into CompletionChunk structs
+                # rather than through the SDK's pydantic models
+                async for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].lstrip()
+                    if data == "[DONE]":
+                        break
+                    chunk = _CHUNK_DECODER.decode(data)
+                    if chunk.error is not None:
+                        raise APIError(
+                            chunk.error.get("message", "Error in OpenAI stream"),
+                            response.http_response.request,
+                            body=chunk.error,
+                        )
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for item in parser.feed(chunk.choices[0].delta.content):
+                        try:
+                            yield decoder.decode(item)
+                        except msgspec.DecodeError as e:
+                            logger.warning("Skipping invalid item from OpenAI: %s", e)
+                    if parser.finished:
+                        break
+        except Exception:
+            if parser.text:
+                logger.error("Unparsed Text of AI Response: %s", parser.text)
+            raise
+
+        if not parser.started:
+            raise ValueError(f"OpenAI response is not a list: {parser.text}")
+        if not parser.finished:
+            raise ValueError("OpenAI response ended before the JSON array was complete")
+
+    async def open_openai_stream(
+        self,
+        messages: List[Mapping],
+        response_format: Optional[dict],
+        stack: contextlib.AsyncExitStack,
+    ) -> AsyncAPIResponse:
+        """
+        Starts a streamed chat completion and returns the raw, unread HTTP response, which is
+        closed when stack exits. Transient errors are retried with exponential backoff; only
+        opening the stream is retried, since evidence may already have been handed out once
+        it is being read. A concurrency slot is taken per attempt, so requests waiting out a
+        backoff do not hold slots other requests could use.
+        """
+        create_stream = self.openai_client.chat.completions.with_streaming_response.create
+        try:
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+                wait=wait_exponential_jitter(initial=1, max=30),
+                stop=stop_after_attempt(4),
+                reraise=True,
+            ):
+                with attempt:
+                    async with contextlib.AsyncExitStack() as attempt_stack:
+                        await attempt_stack.enter_async_context(self.openai_semaphore)
+                        request = create_stream(
+                            model=self.config.model,  # Use model from config (default: gpt-4o)
+                            messages=messages,
+                            # Deterministic sampling for factual responses, so a cached answer
+                            # is also the canonical one
+                            temperature=0,
+                            seed=42,
+                            response_format=response_format or NOT_GIVEN,
+                            stream=True
+                        )
+                        response = await attempt_stack.enter_async_context(request)
+                        # The slot stays held until the response is closed with stack; a failed
+                        # attempt releases it before the backoff
+                        stack.push_async_exit(attempt_stack.pop_all())
+        except _RETRYABLE_ERRORS:
+            self.openai_breaker.record_failure()
+            raise
+        self.openai_breaker.record_success()
+        return response
 
     def setup_axon(self):
         self.axon = bt.axon(wallet=self.wallet, config=self.config)
@@ -226,7 +701,11 @@ Find the most reliable and relevant sources available."""
         bt.logging.info(f"Starting axon server on port: {self.config.axon.port}")
         self.axon.start()
 
-    def run(self):
+    def sync_metagraph(self) -> Set[str]:
+        self.metagraph.sync()
+        return set(self.metagraph.hotkeys)
+
+    async def run(self):
         bt.logging.info("Setting up axon")
         self.setup_axon()
 
@@ -234,24 +713,35 @@ Find the most reliable and relevant sources available."""
         self.setup_proxy_logger()
 
         bt.logging.info("Starting main loop")
-        step = 0
-        while True:
-            try:
-                if step % 60 == 0:
-                    self.metagraph.sync()
+        try:
+            while True:
+                try:
+                    # metagraph.sync is blocking network I/O, so keep it off the event loop. The
+                    # new hotkey set is built in the worker thread and swapped in with a single
+                    # assignment, so blacklist_fn never sees a partially populated set.
+                    self.hotkey_set = await asyncio.to_thread(self.sync_metagraph)
+                    self.my_subnet_uid = self.metagraph.hotkeys.index(
+                        self.wallet.hotkey.ss58_address
+                    )
                     log = (f"Block: {self.metagraph.block.item()} | "
                            f"Incentive: {self.metagraph.I[self.my_subnet_uid]} | ")
                     bt.logging.info(log)
-                step += 1
-                time.sleep(1)
-            except KeyboardInterrupt:
-                self.axon.stop()
-                bt.logging.success("OpenAI Miner killed by keyboard interrupt.")
-                break
-            except Exception as e:
-                bt.logging.error(traceback.format_exc())
-                continue
+                except Exception as e:
+                    bt.logging.error(traceback.format_exc())
+                await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            # asyncio.run cancels the main task on keyboard interrupt. The OpenAI HTTP client
+            # is not closed explicitly: its connections belong to the axon's event loop, and
+            # they are released when the process exits.
+            self.axon.stop()
+            bt.logging.success("OpenAI Miner killed by keyboard interrupt.")
+            if self.log_listener is not None:
+                # Flushes any records still waiting to be shipped
+                self.log_listener.stop()
 
 if __name__ == "__main__":
     miner = MinerOpenAI()
-    miner.run()
\ No newline at end of file
+    try:
+        asyncio.run(miner.run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,68 @@
+from typing import Hashable, List, Optional, Tuple
+
+from cachetools import Cache
+
+# Optional dependencies, only needed when the semantic cache is enabled (pip install faiss-cpu)
+import faiss
+import numpy as np
+from openai import AsyncOpenAI
+
+
+class SemanticCache:
+    """
+    Second cache tier that matches near-duplicate statements by embedding similarity.
+
+    Each answered prompt is embedded and added to an in-memory FAISS index together with its
+    exact cache key. A new prompt whose embedding has a cosine similarity of at least threshold
+    with a stored one reuses that key, as long as the entry is still present in cache.
+    """
+
+    def __init__(
+        self,
+        openai_client: AsyncOpenAI,
+        cache: Cache,
+        threshold: float = 0.95,
+        model: str = "text-embedding-3-small",
+        dimensions: int = 1536,
+    ):
+        self.openai_client = openai_client
+        self.cache = cache
+        self.threshold = threshold
+        self.model = model
+        # Inner product over normalized vectors is cosine similarity
+        self.index = faiss.IndexFlatIP(dimensions)
+        self.keys: List[Hashable] = []
+
+    async def embed(self, statement: str, sources: Tuple[str, ...]) -> np.ndarray:
+        # Sources are part of the input so the same statement with other sources does not match
+        text = statement
+        if sources:
+            text += "\nSources: " + ", ".join(sources)
+        response = await self.openai_client.embeddings.create(model=self.model, input=text)
+        embedding = np.array([response.data[0].embedding], dtype=np.float32)
+        faiss.normalize_L2(embedding)
+        return embedding
+
+    def search(self, embedding: np.ndarray) -> Optional[Hashable]:
+        if not self.keys:
+            return None
+        scores, rows = self.index.search(embedding, 1)
+        if rows[0][0] < 0 or scores[0][0] < self.threshold:
+            return None
+        key = self.keys[rows[0][0]]
+        return key if key in self.cache else None
+
+    def add(self, embedding: np.ndarray, key: Hashable) -> None:
+        self.index.add(embedding)
+        self.keys.append(key)
+        if len(self.keys) > 2 * max(self.cache.maxsize, 1):
+            self._compact()
+
+    def _compact(self) -> None:
+        # Drop rows whose entries have been evicted from or expired in the exact cache
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        live = [i for i, key in enumerate(self.keys) if key in self.cache]
+        self.index.reset()
+        if live:
+            self.index.add(vectors[live])
+        self.keys = [self.keys[i] for i in live]
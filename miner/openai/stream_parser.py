@@ -0,0 +1,87 @@
+import re
+from typing import List, Optional
+
+# Start of the JSON document (an array or an object)
+_JSON_OPEN_RE = re.compile(r"[\[{]")
+# What may precede the document: whitespace and an opening markdown fence such as ```json
+_FENCE_RE = re.compile(r"\s*(?:```[A-Za-z]*\s*)?")
+# Structural characters the scanner has to look at; everything else is skipped over
+_JSON_TOKEN_RE = re.compile(r'[\[\]{}"\\]')
+
+
+class JsonStreamParser:
+    """
+    Incrementally extracts the objects nested at ``item_depth`` of a streamed JSON document.
+
+    With the default depth of 2 this yields each element of a top level array of objects,
+    e.g. ``[{"url": ..., "snippet": ...}, ...]``. Text is fed in chunks as it arrives and each
+    object is cut out as soon as its closing brace is seen, so only the unfinished tail of the
+    stream is ever buffered. A leading markdown fence (```json, a bare ``` or any other tag)
+    is skipped and anything after the end of the document, such as a closing fence, is ignored.
+    """
+
+    def __init__(self, item_depth: int = 2):
+        self.item_depth = item_depth
+        self.text = ""  # unconsumed tail of the stream
+        self.started = False
+        self.finished = False
+        self._scan_pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape_end = 0  # characters before this offset are escaped string content
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Adds the next chunk of the stream and returns the JSON text of the objects completed by
+        it, ready to be decoded.
+        Raises ValueError if the stream does not start with a JSON document.
+        """
+        items = []
+        if self.finished or not chunk:
+            return items
+        self.text += chunk
+
+        if not self.started:
+            match = _JSON_OPEN_RE.search(self.text)
+            if match is None:
+                return items
+            if not _FENCE_RE.fullmatch(self.text, 0, match.start()):
+                prefix = self.text[:match.start()].strip()
+                raise ValueError(f"Response does not start with JSON: {prefix[:100]}")
+            self.started = True
+            self._scan_pos = match.start()
+
+        for match in _JSON_TOKEN_RE.finditer(self.text, self._scan_pos):
+            index = match.start()
+            if index < self._escape_end:
+                continue
+            char = match.group()
+            if self._in_string:
+                if char == "\\":
+                    self._escape_end = index + 2
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+                if self._depth == self.item_depth and char == "{":
+                    self._item_start = index
+            elif char in "]}":
+                if self._depth == self.item_depth and self._item_start is not None:
+                    items.append(self.text[self._item_start:index + 1])
+                    self._item_start = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self.finished = True
+                    break
+
+        # Release everything that has been scanned and is not part of an unfinished object
+        cut = len(self.text) if self._item_start is None else self._item_start
+        self.text = self.text[cut:]
+        self._scan_pos = len(self.text)
+        self._escape_end = max(self._escape_end - cut, 0)
+        if self._item_start is not None:
+            self._item_start -= cut
+        return items